@@ -56,8 +56,9 @@ def calc_asl(ifile, var_id, ofile):
     darray = dset_in[var_id].sel(latitude=slice(south_lat, north_lat), 
                                  longitude=slice(west_lon, east_lon))
 
-    assert darray.dims == ('time', 'latitude', 'longitude'), \
-    "Order of the data must be time, latitude, longitude"
+    assert set(darray.dims) == set(['time', 'latitude', 'longitude']), \
+    "Data must have time, latitude and longitude dimensions"
+    darray = darray.transpose('time', 'latitude', 'longitude')
 
     # Get axis information
     lat_values = darray['latitude'].values
@@ -108,8 +108,9 @@ def main(inargs):
     subset_dict = gio.get_subset_kwargs(inargs)
     darray = dset_in[inargs.var].sel(**subset_dict)
 
-    assert darray.dims == ('time', 'latitude', 'longitude'), \
-    "Order of the data must be time, latitude, longitude"
+    assert set(darray.dims) == set(['time', 'latitude', 'longitude']), \
+    "Data must have time, latitude and longitude dimensions"
+    darray = darray.transpose('time', 'latitude', 'longitude')
 
     # Generate datetime list
     dt_list, dt_list_metadata = get_datetimes(darray, inargs.date_file)
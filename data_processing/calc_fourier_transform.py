@@ -65,7 +65,7 @@ def fourier_transform(signal, indep_var):
     spacing = indep_var[1] - indep_var[0]
     sig_fft = fftpack.fft(signal)
     sample_freq = fftpack.fftfreq(len(indep_var), d=spacing) * len(indep_var) * spacing  #units = cycles per length of domain
-    sample_freq = numpy.resize(sample_freq, sig_fft.shape)
+    sample_freq = numpy.broadcast_to(sample_freq, sig_fft.shape)  # read-only view, no copy
     
     return sig_fft, sample_freq
 
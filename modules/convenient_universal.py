@@ -21,8 +21,8 @@ Functions:
 """
 
 import numpy
-from scipy import stats
-import pdb, re
+from scipy import fftpack, stats
+import pdb
 import inspect
 
 
@@ -43,15 +43,12 @@ def adjust_lon_range(lons, radians=True, start=0.0):
     interval360 = 2.0*numpy.pi if radians else 360.0
     end = start + interval360    
     
-    less_than_start = numpy.ones([len(lons),])
-    while numpy.sum(less_than_start) != 0:
-        lons = numpy.where(lons < start, lons + interval360, lons)
-        less_than_start = lons < start
+    lons = lons - interval360 * numpy.floor((lons - start) / interval360)
     
-    more_than_end = numpy.ones([len(lons),])
-    while numpy.sum(more_than_end) != 0:
-        lons = numpy.where(lons >= end, lons - interval360, lons)
-        more_than_end = lons >= end
+    # Guard against floating point round-off at the interval edges
+    # (arithmetic rather than numpy.where so masked arrays keep their mask)
+    lons = lons + interval360 * (lons < start)
+    lons = lons - interval360 * (lons >= end)
 
     return lons
 
@@ -70,13 +67,10 @@ def apply_lon_filter(data, lon_bounds):
     lon_max = adjust_lon_range(lon_bounds[1], radians=False, start=0.0)
     lon_axis = adjust_lon_range(data.getLongitude()[:], radians=False, start=0.0)
 
-    # Make required values zero
-    ntimes, nlats, nlons = data.shape
-    lon_axis_tiled = numpy.tile(lon_axis, (ntimes, nlats, 1))
-    
-    new_data = numpy.where(lon_axis_tiled < lon_min, 0.0, data)
-    
-    return numpy.where(lon_axis_tiled > lon_max, 0.0, new_data)
+    # Make required values zero (lon_axis broadcasts along the trailing axis)
+    outside = (lon_axis < lon_min) | (lon_axis > lon_max)
+
+    return numpy.where(outside, 0.0, data)
 
 
 def broadcast_array(array, axis_index, shape):
@@ -127,21 +121,32 @@ def calc_significance(data_subset, data_all, standard_name):
     
     """
 
-    from statsmodels.tsa.stattools import acf
-
     # Data must be three dimensional, with time first
     assert len(data_subset.shape) == 3, "Input data must be 3 dimensional"
-    
-    # Define autocorrelation function
+
+    # Calculate effective sample size (formula from Zieba2010, eq 12).
+    # The autocorrelation function (lags 1 to n - 2; same result as
+    # statsmodels acf) is calculated via a zero padded FFT, processing the
+    # grid points in blocks to limit the size of the FFT arrays.
     n = data_subset.shape[0]
-    autocorr_func = numpy.apply_along_axis(acf, 0, data_subset, nlags=n - 2)
-    
-    # Calculate effective sample size (formula from Zieba2010, eq 12)
     k = numpy.arange(1, n - 1)
-    
-    r_k_sum = ((n - k[:, None, None]) / float(n)) * autocorr_func[1:] 
-    n_eff = float(n) / (1 + 2 * r_k_sum.sum(axis=0))
-    
+    weights = (n - k) / float(n)
+
+    nfft = fftpack.next_fast_len(2 * n - 1)
+    data_flat = data_subset.reshape(n, -1)
+    npoints = data_flat.shape[1]
+    block_size = max(1, 1000000 // nfft)
+
+    r_k_sum = numpy.empty(npoints)
+    for start in range(0, npoints, block_size):
+        block = data_flat[:, start:start + block_size]
+        anomalies = block - block.mean(axis=0)
+        power = numpy.abs(numpy.fft.rfft(anomalies, n=nfft, axis=0))**2
+        autocov = numpy.fft.irfft(power, n=nfft, axis=0)
+        r_k_sum[start:start + block_size] = numpy.dot(weights, autocov[1:n - 1]) / autocov[0]
+
+    n_eff = float(n) / (1 + 2 * r_k_sum.reshape(data_subset.shape[1:]))
+
     # Calculate significance
     var_x = data_subset.var(axis=0) / n_eff
     tvals = (data_subset.mean(axis=0) - data_all.mean(axis=0)) / numpy.sqrt(var_x)
@@ -210,8 +215,8 @@ def fix_label(label):
 def get_threshold(data, threshold_str, axis=None):
     """Turn the user input threshold into a numeric threshold."""
     
-    if 'pct' in threshold_str:
-        value = float(re.sub('pct', '', threshold_str))
+    if threshold_str.endswith('pct'):
+        value = float(threshold_str[:-3])
         threshold_float = numpy.percentile(data, value, axis=axis)
     else:
         threshold_float = float(threshold_str)
@@ -287,18 +292,16 @@ def split_dt(dt):
 def single2list(item, numpy_array=False):
     """Check if item is a list, then convert if not."""
     
-    if type(item) == list or type(item) == tuple or type(item) == numpy.ndarray:
-        output = item 
-    elif type(item) == str:
-        output = [item,]
+    if isinstance(item, (list, tuple, numpy.ndarray)):
+        output = item
+    elif hasattr(item, '__array__') and numpy.ndim(item) > 0:
+        # e.g. pandas Series or xarray DataArray (don't nest in a list)
+        output = numpy.asanyarray(item)
     else:
-        try:
-            test = len(item)
-        except TypeError:
-            output = [item,]
+        output = [item,]
 
-    if numpy_array and not isinstance(output, numpy.ndarray):
-        return numpy.array(output)
+    if numpy_array:
+        return numpy.asanyarray(output)  # keeps the mask of masked arrays
     else:
         return output
 